@@ -1,9 +1,12 @@
 import json
+import logging
 import os
 
 import requests
 from anthropic import Anthropic
 
+logger = logging.getLogger(__name__)
+
 
 def get_pr_number():
     with open(os.environ["GITHUB_EVENT_PATH"]) as f:
@@ -28,7 +31,7 @@ def get_pr_diff():
         response.raise_for_status()
         return response.text
     except requests.exceptions.RequestException as e:
-        print(f"Error getting PR diff: {e}")
+        logger.error("Error getting PR diff: %s", e)
         return None
 
 
@@ -50,12 +53,13 @@ def post_review_comment(comment):
             json=data
         )
         response.raise_for_status()
-        print(f"Comment posted successfully: {response.status_code}")
+        logger.info("Comment posted successfully: %s", response.status_code)
     except requests.exceptions.RequestException as e:
-        print(f"Error posting comment: {e}")
+        logger.error("Error posting comment: %s", e)
 
 
 def main():
+    logging.basicConfig(level=logging.INFO)
     diff = get_pr_diff()
     client = Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
 
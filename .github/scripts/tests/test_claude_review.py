@@ -1,3 +1,4 @@
+import logging
 import os
 import pytest
 import requests_mock
@@ -22,16 +23,16 @@ def test_get_pr_diff(mock_env):
         diff = get_pr_diff()
         assert diff == "diff content"
 
-def test_post_review_comment(mock_env, capsys):
+def test_post_review_comment(mock_env, caplog):
     with requests_mock.Mocker() as mock:
         mock.post(
             "https://api.github.com/repos/owner/repo/issues/123/comments",
             status_code=201,
             json={"id": 1234, "html_url": "https://example.com/comment"}
         )
-        post_review_comment("This is a test comment")
-        captured = capsys.readouterr()
-        assert "Comment posted successfully:" in captured.out
+        with caplog.at_level(logging.INFO):
+            post_review_comment("This is a test comment")
+        assert "Comment posted successfully:" in caplog.text
 
 @patch("claude_review.get_pr_diff")
 @patch("claude_review.post_review_comment")
@@ -1,18 +1,242 @@
 import argparse
 import base64
-import json
+import hashlib
+import logging
+import logging.handlers
 import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image as PILImage
+# Only the PDF canvas is used here. ReportLab's renderPM backend (rl_renderPM or
+# rlPyCairo) rasterizes drawings to bitmaps and plays no part in writing PDFs, so
+# installing or selecting it does not speed up exports. Image cost is controlled
+# by SlackPDFExporter._prepare_image instead.
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
 
+logger = logging.getLogger("slack_export")
+
+
+def _json(response: requests.Response) -> Dict:
+    """
+    Decodes a JSON response body with orjson, which is considerably faster than the
+    standard library decoder used by ``response.json()``.
+
+    Args:
+        response (requests.Response): The HTTP response.
+
+    Returns:
+        dict: The decoded JSON body.
+    """
+    return orjson.loads(response.content)
+
+
+def _json_default(obj):
+    """
+    Serializes values orjson does not handle natively. Image data is kept as raw
+    bytes in memory and only base64-encoded when written to a JSON export.
+
+    Args:
+        obj: The value to serialize.
+
+    Returns:
+        str: The base64-encoded value of a bytes object.
+
+    Raises:
+        TypeError: If the value is not bytes.
+    """
+    if isinstance(obj, bytes):
+        return base64.b64encode(obj).decode('utf-8')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class _SlackRetry(Retry):
+    """
+    Retry policy for Slack requests. Unlike the default policy, it does not wait out
+    the Retry-After delay of a 429 response itself: that would only stall the worker
+    that was rate limited, so 429s are returned to SlackExporter._request, which pauses
+    every worker instead.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset({413, 503})
+
+
+class ExportCache:
+    """
+    On-disk cache that lets repeated exports skip work: downloaded files are stored with
+    their ETags so they can be revalidated instead of re-fetched, and user profiles and
+    channel IDs are stored so they do not have to be listed again on every run.
+
+    Attributes:
+        path (str): The path of the SQLite database file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens (and if necessary creates) the cache database.
+
+        Args:
+            path (str): The path of the SQLite database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS attachments (url TEXT PRIMARY KEY, etag TEXT, data BLOB)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, profile BLOB, fetched_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS channels (name TEXT PRIMARY KEY, id TEXT, fetched_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS listings (name TEXT PRIMARY KEY, completed_at REAL)"
+            )
+
+    def get_attachment(self, url: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Looks up a cached download.
+
+        Args:
+            url (str): The URL of the file.
+
+        Returns:
+            tuple: The ETag and the file contents, or None if the URL is not cached.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, data FROM attachments WHERE url = ?", (url,)
+            ).fetchone()
+
+    def put_attachment(self, url: str, etag: str, data: bytes):
+        """
+        Stores a download together with the ETag it was served with.
+
+        Args:
+            url (str): The URL of the file.
+            etag (str): The ETag response header.
+            data (bytes): The file contents.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO attachments (url, etag, data) VALUES (?, ?, ?)",
+                (url, etag, data)
+            )
+
+    def load_users(self, max_age: float) -> Dict[str, Dict]:
+        """
+        Loads the user profiles stored within the last ``max_age`` seconds.
+
+        Args:
+            max_age (float): The maximum age of a profile, in seconds.
+
+        Returns:
+            dict: The profiles keyed by user ID.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, profile FROM users WHERE fetched_at >= ?", (time.time() - max_age,)
+            ).fetchall()
+        return {user_id: orjson.loads(profile) for user_id, profile in rows}
+
+    def save_users(self, profiles: Dict[str, Dict]):
+        """
+        Stores user profiles, replacing any older copies.
+
+        Args:
+            profiles (dict): The profiles keyed by user ID.
+        """
+        fetched_at = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO users (id, profile, fetched_at) VALUES (?, ?, ?)",
+                [(user_id, orjson.dumps(profile), fetched_at) for user_id, profile in profiles.items()]
+            )
+
+    def is_listed(self, name: str, max_age: float) -> bool:
+        """
+        Checks whether a full listing completed within the last ``max_age`` seconds.
+
+        Args:
+            name (str): The name of the listing, e.g. "users".
+            max_age (float): The maximum age of the listing, in seconds.
+
+        Returns:
+            bool: True if the listing is recent enough to rely on.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM listings WHERE name = ? AND completed_at >= ?", (name, time.time() - max_age)
+            ).fetchone() is not None
+
+    def mark_listed(self, name: str):
+        """
+        Records that a full listing has just completed.
+
+        Args:
+            name (str): The name of the listing, e.g. "users".
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listings (name, completed_at) VALUES (?, ?)", (name, time.time())
+            )
+
+    def load_channels(self, max_age: float) -> Dict[str, str]:
+        """
+        Loads the channel name-to-ID entries stored within the last ``max_age`` seconds.
+
+        Args:
+            max_age (float): The maximum age of an entry, in seconds.
+
+        Returns:
+            dict: The channel IDs keyed by channel name.
+        """
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT name, id FROM channels WHERE fetched_at >= ?", (time.time() - max_age,)
+            ).fetchall())
+
+    def save_channels(self, channel_ids: Dict[str, str]):
+        """
+        Stores channel IDs, replacing any older copies.
+
+        Args:
+            channel_ids (dict): The channel IDs keyed by channel name.
+        """
+        fetched_at = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO channels (name, id, fetched_at) VALUES (?, ?, ?)",
+                [(name, channel_id, fetched_at) for name, channel_id in channel_ids.items()]
+            )
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
 class SlackExporter:
     """
     Utility class to export messages from a Slack channel.
@@ -20,41 +244,244 @@ class SlackExporter:
     Attributes:
         token (str): The Slack API token used for authentication.
         headers (dict): The HTTP headers used for Slack API requests.
-        users_cache (dict): A cache to store user information.
+        session (requests.Session): Pooled, authenticated session for Slack API and file requests.
+        cdn_session (requests.Session): Pooled, unauthenticated session for avatar CDN requests.
+        users_cache (dict): A cache of user profiles keyed by user ID; avatars are downloaded on first use.
+        cache (ExportCache): Optional on-disk cache of downloads, user profiles and channel IDs shared across runs.
+        max_workers (int): The maximum number of concurrent Slack requests.
+        pool (ThreadPoolExecutor): Worker pool used to process messages and fetch thread replies concurrently.
+        download_pool (ThreadPoolExecutor): Worker pool used to download attachments concurrently.
     """
 
-    def __init__(self, token: str):
+    MAX_WORKERS = 8
+    AVATAR_CACHE_SIZE = 4096
+    ATTACHMENT_CACHE_SIZE = 64
+    PAGE_LIMIT = 999
+    FALLBACK_PAGE_LIMIT = 200
+    BATCH_SIZE = 100
+    RATE_LIMIT_RETRIES = 5
+    REQUEST_TIMEOUT = 30
+    USER_CACHE_TTL = 7 * 24 * 60 * 60
+    # A channel's ID never changes, but its name can be renamed and then reused by a
+    # new channel, so cached names are listed again after a day.
+    CHANNEL_CACHE_TTL = 24 * 60 * 60
+    # The only fields read from raw messages and their files. The rest of a message
+    # (blocks, reactions, file thumbnails, ...) is dropped while the history is buffered.
+    MESSAGE_FIELDS = ("user", "text", "ts", "thread_ts", "reply_count", "files")
+    FILE_FIELDS = ("name", "mimetype", "url_private")
+    # Channel names are lowercase, so an uppercase C/G-prefixed string can only be an ID.
+    CHANNEL_ID_PATTERN = re.compile(r"[CG][A-Z0-9]{8,}")
+
+    def __init__(self, token: str, cache_path: str = None, max_workers: int = MAX_WORKERS):
         """
         Initializes the SlackExporter with the provided Slack API token.
 
         Args:
             token (str): The Slack API token.
+            cache_path (str, optional): Path of an SQLite file used to cache downloads, users and channels between runs.
+            max_workers (int, optional): The maximum number of concurrent Slack requests.
         """
         self.token = token
         self.headers = {"Authorization": f"Bearer {token}"}
+        self.session = self._create_session(max_workers, self.headers)
+        self.cdn_session = self._create_session(max_workers)
         self.users_cache = {}
+        self._users_lock = threading.Lock()
+        self.cache = ExportCache(cache_path) if cache_path else None
+        self._channel_ids = self.cache.load_channels(self.CHANNEL_CACHE_TTL) if self.cache else {}
+        self._channels_listed = False
+        self._download_avatar = lru_cache(maxsize=self.AVATAR_CACHE_SIZE)(self._fetch_avatar)
+        # Files shared into several messages keep the same url_private; a small LRU
+        # avoids downloading them again without holding every attachment in memory.
+        self._download_attachment = lru_cache(maxsize=self.ATTACHMENT_CACHE_SIZE)(self.download_image)
+        self.max_workers = max_workers
+        # Messages and downloads use separate pools so a message worker waiting
+        # on its attachments can never starve the pool it is waiting on.
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.download_pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._request_slots = threading.Semaphore(max_workers)
+        self._rate_limit_lock = threading.Lock()
+        self._resume_at = 0.0
+
+    @staticmethod
+    def _create_session(pool_size: int, headers: Dict = None) -> requests.Session:
+        """
+        Creates a session that keeps connections alive and retries transient failures.
+
+        Args:
+            pool_size (int): The number of connections kept alive per host. This should be at
+                least the number of workers, otherwise connections opened by surplus workers
+                are closed after a single request instead of being returned to the pool.
+            headers (dict, optional): Headers sent with every request made through the session.
+
+        Returns:
+            requests.Session: The configured session.
+        """
+        session = requests.Session()
+        if headers:
+            session.headers.update(headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_size,
+            max_retries=_SlackRetry(
+                total=10,
+                backoff_factor=1.0,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["GET", "POST"],
+                respect_retry_after_header=True,
+                # Hand back the last error response rather than raising, so a file that
+                # keeps failing is skipped instead of aborting the export.
+                raise_on_status=False
+            )
+        )
+        session.mount("https://", adapter)
+        return session
+
+    def close(self):
+        """
+        Shuts down the worker pools and closes the pooled connections and the on-disk cache.
+        """
+        self.pool.shutdown()
+        self.download_pool.shutdown()
+        self.session.close()
+        self.cdn_session.close()
+        if self.cache:
+            self.cache.close()
+
+    def _request(self, method: str, url: str, session: requests.Session = None, **kwargs) -> requests.Response:
+        """
+        Sends a request while capping the number of requests in flight across all workers.
+
+        A rate-limited (429) response pauses every worker for the Retry-After delay
+        before the request is retried, rather than only the worker that hit the limit.
+        Requests time out after REQUEST_TIMEOUT seconds unless a timeout is given.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            session (requests.Session, optional): The session to use. Defaults to the authenticated session.
+            **kwargs: Additional arguments passed to the session.
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        session = session or self.session
+        kwargs.setdefault("timeout", self.REQUEST_TIMEOUT)
+        for _ in range(self.RATE_LIMIT_RETRIES):
+            self._wait_for_rate_limit()
+            with self._request_slots:
+                response = getattr(session, method)(url, **kwargs)
+            if response.status_code != 429:
+                break
+            self._pause_requests(response)
+        return response
+
+    def _pause_requests(self, response: requests.Response):
+        """
+        Holds back all new requests for the Retry-After delay of a rate-limited response.
+
+        Args:
+            response (requests.Response): The rate-limited response.
+        """
+        delay = float(response.headers.get("Retry-After", 1))
+        with self._rate_limit_lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def _wait_for_rate_limit(self):
+        """
+        Sleeps until the pause set by the most recent rate-limited response has elapsed.
+        """
+        with self._rate_limit_lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _api_get(self, url: str, params: Dict) -> Dict:
+        """
+        Calls a Slack API method and decodes the response.
+
+        Some Slack tiers signal rate limiting with a 200 response whose body is
+        ``{"ok": false, "error": "ratelimited"}``. Those responses pause all workers
+        like a 429 does and are then retried.
+
+        Args:
+            url (str): The Slack API method URL.
+            params (dict): The query parameters.
+
+        Returns:
+            dict: The decoded response.
+        """
+        for _ in range(self.RATE_LIMIT_RETRIES):
+            response = self._request("get", url, params=params)
+            result = _json(response)
+            if result.get("error") != "ratelimited":
+                break
+            self._pause_requests(response)
+        return result
+
+    def _paginate(self, url: str, params: Dict):
+        """
+        Yields the pages of a cursor-paginated Slack API method.
+
+        If Slack rejects the requested page size on the first page, the request is
+        repeated with FALLBACK_PAGE_LIMIT. Iteration ends after the first page that
+        has no next cursor, which includes failed responses.
+
+        Args:
+            url (str): The Slack API method URL.
+            params (dict): The query parameters for the first page.
+
+        Yields:
+            dict: The decoded response for each page.
+        """
+        params = dict(params)
+
+        while True:
+            result = self._api_get(url, dict(params))
+            if (result.get("error") == "invalid_limit" and "cursor" not in params
+                    and params.get("limit", 0) > self.FALLBACK_PAGE_LIMIT):
+                params["limit"] = self.FALLBACK_PAGE_LIMIT
+                continue
+
+            yield result
+
+            cursor = result.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return
+            params["cursor"] = cursor
 
     def get_channel_id(self, channel_name: str) -> str:
         """
         Retrieves the channel ID for the given channel name.
 
+        A channel ID is returned as is, without any lookup. The name-to-ID map is reused
+        by later lookups and, when a cache is configured, by later runs for up to
+        CHANNEL_CACHE_TTL, after which names are resolved again in case a channel was
+        renamed. The workspace's channels are only listed when the name is not already
+        known, and at most once per exporter.
+
         Args:
-            channel_name (str): The name of the Slack channel.
+            channel_name (str): The name or ID of the Slack channel.
 
         Returns:
-            str: The channel ID.
+            str: The channel ID, or an empty string if the channel was not found.
         """
-        response = requests.get(
-            "https://slack.com/api/conversations.list",
-            headers=self.headers,
-            params={"types": "public_channel,private_channel"}
-        )
-        channels = response.json()["channels"]
-        channel = next((c for c in channels if c["name"] == channel_name), None)
-        if channel:
-            return channel["id"]
-        else:
-            return ""
+        if self.CHANNEL_ID_PATTERN.fullmatch(channel_name):
+            return channel_name
+
+        if channel_name not in self._channel_ids and not self._channels_listed:
+            channel_ids = {}
+            params = {"types": "public_channel,private_channel", "limit": 1000}
+            for result in self._paginate("https://slack.com/api/conversations.list", params):
+                if not result["ok"]:
+                    return ""
+                channel_ids.update({c["name"]: c["id"] for c in result["channels"]})
+            self._channel_ids.update(channel_ids)
+            self._channels_listed = True
+            if self.cache:
+                self.cache.save_channels(channel_ids)
+
+        return self._channel_ids.get(channel_name, "")
 
     def fetch_user_info(self, user_id: str) -> Dict:
         """
@@ -66,49 +493,140 @@ class SlackExporter:
         Returns:
             dict: The user information, including the user's name, real name, and profile image (if available).
         """
-        if user_id in self.users_cache:
-            return self.users_cache[user_id]
+        with self._users_lock:
+            profile = self.users_cache.get(user_id)
 
-        response = requests.get(
-            f"https://slack.com/api/users.info",
-            headers=self.headers,
-            params={"user": user_id}
-        )
-        result = response.json()
-        if not result["ok"]:
-            return {"name": user_id, "image": ""}
-
-        user = result["user"]
-        image_url = user["profile"].get("image_48", "")
-        image_data = ""
-        if image_url:
-            img_response = requests.get(image_url, headers=self.headers)
-            if img_response.status_code == 200:
-                image_data = base64.b64encode(img_response.content).decode('utf-8')
-
-        user_info = {
+        if profile is None:
+            result = self._api_get("https://slack.com/api/users.info", {"user": user_id})
+            if not result["ok"]:
+                return {"name": user_id, "image": b""}
+
+            with self._users_lock:
+                profile = self.users_cache.setdefault(user_id, self._build_profile(user_id, result["user"]))
+            if self.cache:
+                self.cache.save_users({user_id: profile})
+
+        image_url = profile["image_url"]
+        return {
+            "id": profile["id"],
+            "name": profile["name"],
+            "real_name": profile["real_name"],
+            "image": self._download_avatar(image_url) if image_url else b""
+        }
+
+    @staticmethod
+    def _build_profile(user_id: str, user: Dict) -> Dict:
+        """
+        Extracts the fields used by the exporter from a Slack user object.
+
+        Args:
+            user_id (str): The Slack user ID.
+            user (dict): The user object returned by users.info or users.list.
+
+        Returns:
+            dict: The user's ID, name, real name, and avatar URL.
+        """
+        return {
             "id": user_id,
             "name": user["profile"].get("display_name") or user["name"],
             "real_name": user["profile"].get("real_name", ""),
-            "image": image_data
+            "image_url": user["profile"].get("image_48", "")
         }
-        self.users_cache[user_id] = user_info
-        return user_info
 
-    def download_image(self, url: str) -> str:
+    def _prewarm_users(self):
         """
-        Downloads an image from the given URL and returns it as a base64-encoded string.
+        Populates the user cache from users.list so that individual users.info lookups
+        are only needed for users the listing does not return (e.g. external users).
+
+        When a complete users.list finished within USER_CACHE_TTL, the profiles in the
+        on-disk cache are used instead and users.list is not called. Profiles saved by
+        individual users.info lookups do not count, so they never hold off a new listing.
+        """
+        if self.cache and self.cache.is_listed("users", self.USER_CACHE_TTL):
+            profiles = self.cache.load_users(self.USER_CACHE_TTL)
+            with self._users_lock:
+                self.users_cache.update(profiles)
+            return
+
+        for result in self._paginate("https://slack.com/api/users.list", {"limit": 1000}):
+            if not result["ok"]:
+                break
+
+            profiles = {u["id"]: self._build_profile(u["id"], u) for u in result["members"]}
+            with self._users_lock:
+                self.users_cache.update(profiles)
+            if self.cache:
+                self.cache.save_users(profiles)
+        else:
+            if self.cache:
+                self.cache.mark_listed("users")
+
+    def _fetch_avatar(self, url: str) -> bytes:
+        """
+        Downloads an avatar image from the avatar CDN. Results are memoized per URL.
+
+        Args:
+            url (str): The URL of the avatar image.
+
+        Returns:
+            bytes: The image data, or empty bytes if the download failed.
+        """
+        return self._download(url, self.cdn_session) or b""
+
+    def _download(self, url: str, session: requests.Session) -> Optional[bytes]:
+        """
+        Downloads a file, revalidating against the attachment cache when one is configured.
+
+        Args:
+            url (str): The URL of the file.
+            session (requests.Session): The session to download with.
+
+        Returns:
+            bytes: The file contents, or None if the download failed.
+        """
+        cached = self.cache.get_attachment(url) if self.cache else None
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        response = self._request("get", url, session=session, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code != 200:
+            return None
+
+        etag = response.headers.get("ETag")
+        if self.cache and etag:
+            self.cache.put_attachment(url, etag, response.content)
+        return response.content
+
+    def download_image(self, url: str) -> bytes:
+        """
+        Downloads an image from the given URL and returns its raw bytes.
 
         Args:
             url (str): The URL of the image to be downloaded.
 
         Returns:
-            str: The base64-encoded image data.
+            bytes: The image data, or empty bytes if the download failed.
+        """
+        return self._download(url, self.session) or b""
+
+    @classmethod
+    def _trim_message(cls, message: Dict) -> Dict:
         """
-        response = requests.get(url, headers=self.headers)
-        if response.status_code == 200:
-            return base64.b64encode(response.content).decode('utf-8')
-        return ""
+        Keeps only the fields of a raw message that are used to process it.
+
+        Args:
+            message (dict): The raw Slack message data.
+
+        Returns:
+            dict: A copy of the message with only MESSAGE_FIELDS, and FILE_FIELDS for each file.
+        """
+        trimmed = {key: message[key] for key in cls.MESSAGE_FIELDS if key in message}
+        if "files" in trimmed:
+            trimmed["files"] = [
+                {key: f[key] for key in cls.FILE_FIELDS if key in f} for f in trimmed["files"]
+            ]
+        return trimmed
 
     def process_message(self, message: Dict) -> Dict:
         """
@@ -120,25 +638,29 @@ class SlackExporter:
         Returns:
             dict: The processed message data, including the user information, message text, timestamp, and any attached images.
         """
+        # Start the attachment downloads first so they overlap with the author lookup.
+        image_files = [f for f in message.get("files", []) if f["mimetype"].startswith("image/")]
+        downloads = self.download_pool.map(lambda f: self._download_attachment(f["url_private"]), image_files)
+
         user_info = self.fetch_user_info(message.get("user", ""))
+        timestamp = message.get("ts", "")
         processed = {
             "user": user_info,
             "text": message.get("text", ""),
-            "timestamp": message.get("ts", ""),
+            "timestamp": timestamp,
+            # Same text as strftime('%Y-%m-%d %H:%M:%S'), without going through the C library's strftime.
+            "formatted_time": datetime.fromtimestamp(float(timestamp)).isoformat(' ', 'seconds') if timestamp else "",
             "thread_ts": message.get("thread_ts", ""),
             "files": []
         }
 
-        if "files" in message:
-            for file in message["files"]:
-                if file["mimetype"].startswith("image/"):
-                    image_data = self.download_image(file["url_private"])
-                    if image_data:
-                        processed["files"].append({
-                            "name": file["name"],
-                            "mimetype": file["mimetype"],
-                            "data": image_data
-                        })
+        for file, image_data in zip(image_files, downloads):
+            if image_data:
+                processed["files"].append({
+                    "name": file["name"],
+                    "mimetype": file["mimetype"],
+                    "data": image_data
+                })
 
         return processed
 
@@ -154,39 +676,41 @@ class SlackExporter:
             list: A list of dictionaries, where each dictionary represents a reply message.
         """
         replies = []
-        cursor = None
-
-        while True:
-            params = {
-                "channel": channel_id,
-                "ts": thread_ts,
-                "limit": 100
-            }
-            if cursor:
-                params["cursor"] = cursor
-
-            response = requests.get(
-                "https://slack.com/api/conversations.replies",
-                headers=self.headers,
-                params=params
-            )
+        params = {
+            "channel": channel_id,
+            "ts": thread_ts,
+            "limit": self.PAGE_LIMIT
+        }
 
-            result = response.json()
+        for result in self._paginate("https://slack.com/api/conversations.replies", params):
             if not result["ok"]:
-                print(f"Failed to fetch replies: {result['error']}")
+                logger.error("Failed to fetch replies: %s", result['error'])
                 break
 
-            thread_messages = result["messages"][1:]  # Skip parent message
-            replies.extend([self.process_message(m) for m in thread_messages])
-
-            if not result.get("has_more", False):
-                break
-            cursor = result["response_metadata"]["next_cursor"]
+            # The parent message heads every page, not just the first.
+            replies.extend(self.process_message(m) for m in result["messages"] if m["ts"] != thread_ts)
 
-        # Sort replies by timestamp
-        replies.sort(key=lambda x: float(x['timestamp']))
+        # conversations.replies returns replies oldest first across pages, so no sorting is needed.
         return replies
 
+    def _submit_replies(self, channel_id: str, message: Dict, history_replies: List[Dict]) -> Future:
+        """
+        Schedules the replies of a thread to be processed on the worker pool. Threads whose
+        replies were all returned by conversations.history are reassembled from those
+        messages; any other thread is fetched with conversations.replies.
+
+        Args:
+            channel_id (str): The ID of the Slack channel.
+            message (dict): The raw parent message.
+            history_replies (list): The thread's replies found in the channel history, oldest first.
+
+        Returns:
+            Future: A future resolving to the list of processed replies.
+        """
+        if len(history_replies) >= message["reply_count"]:
+            return self.pool.submit(lambda: [self.process_message(m) for m in history_replies])
+        return self.pool.submit(self.fetch_thread_replies, channel_id, message["ts"])
+
     def export_channel(self, channel_name: str) -> List[Dict]:
         """
         Exports the messages from the specified Slack channel.
@@ -197,60 +721,79 @@ class SlackExporter:
         Returns:
             list: A list of dictionaries, where each dictionary represents a message.
         """
+        return list(self.iter_channel(channel_name))
+
+    def iter_channel(self, channel_name: str) -> Iterator[Dict]:
+        """
+        Yields the processed messages of the specified Slack channel, with their replies attached.
+
+        The raw history is fetched up front so messages can be yielded oldest first, but
+        attachments and replies are only downloaded as each batch of messages is consumed,
+        so callers that write messages out as they arrive never hold the whole export in memory.
+
+        Args:
+            channel_name (str): The name of the Slack channel.
+
+        Yields:
+            dict: A processed message.
+        """
         channel_id = self.get_channel_id(channel_name)
         if not channel_id:
-            return []
+            return
 
-        requests.post(
+        self._prewarm_users()
+
+        self._request(
+            "post",
             "https://slack.com/api/conversations.join",
-            headers=self.headers,
             json={"channel": channel_id}
         )
 
-        all_messages = []
-        cursor = None
+        raw_messages = deque()
         oldest_first = True  # Set to True to get oldest messages first
+        params = {
+            "channel": channel_id,
+            "limit": self.PAGE_LIMIT,
+            "oldest": "0" if oldest_first else None,  # Start from oldest messages
+        }
 
-        while True:
-            params = {
-                "channel": channel_id,
-                "limit": 100,
-                "oldest": "0" if oldest_first else None,  # Start from oldest messages
-            }
-            if cursor:
-                params["cursor"] = cursor
-
-            response = requests.get(
-                "https://slack.com/api/conversations.history",
-                headers=self.headers,
-                params=params
-            )
-
-            result = response.json()
+        for result in self._paginate("https://slack.com/api/conversations.history", params):
             if not result["ok"]:
                 raise Exception(f"Failed to fetch messages: {result['error']}")
 
-            messages = result["messages"]
-            if oldest_first:
-                messages.reverse()  # Reverse to maintain oldest-to-newest order
-
-            for msg in messages:
-                processed_msg = self.process_message(msg)
-                if msg.get("reply_count", 0) > 0:
-                    replies = self.fetch_thread_replies(channel_id, msg["ts"])
-                    processed_msg["replies"] = replies
-                else:
-                    processed_msg["replies"] = []
-                all_messages.append(processed_msg)
-
-            if not result.get("has_more", False):
-                break
-            cursor = result["response_metadata"]["next_cursor"]
+            # The whole history is held until it is processed, so only keep what is used.
+            page = [self._trim_message(msg) for msg in result["messages"]]
 
-        if not oldest_first:
-            all_messages.reverse()  # Reverse if we fetched newest-first
+            # Slack returns newest messages first, so prepending each page in
+            # reverse leaves the deque in chronological order.
+            if oldest_first:
+                raw_messages.extendleft(page)
+            else:
+                raw_messages.extend(page)
+
+        # Replies sent to the channel as well appear in the history too; group them
+        # by thread so threads made up only of such replies need no extra request.
+        history_replies = {}
+        for msg in (raw_messages if oldest_first else reversed(raw_messages)):
+            if msg.get("thread_ts", msg["ts"]) != msg["ts"]:
+                history_replies.setdefault(msg["thread_ts"], []).append(msg)
+
+        # Resolve every author of the history (and download their avatars) concurrently
+        # up front, instead of one at a time as each author's first message comes up.
+        list(self.download_pool.map(self.fetch_user_info, {msg.get("user", "") for msg in raw_messages}))
+
+        while raw_messages:
+            messages = [raw_messages.popleft() for _ in range(min(self.BATCH_SIZE, len(raw_messages)))]
+            futures = {
+                msg["ts"]: self._submit_replies(channel_id, msg, history_replies.get(msg["ts"], []))
+                for msg in messages
+                if msg.get("reply_count", 0) > 0
+            }
 
-        return all_messages
+            for msg, processed_msg in zip(messages, self.pool.map(self.process_message, messages)):
+                future = futures.get(msg["ts"])
+                processed_msg["replies"] = future.result() if future else []
+                yield processed_msg
 
 
 class SlackPDFExporter:
@@ -259,18 +802,38 @@ class SlackPDFExporter:
 
     Attributes:
         exporter (SlackExporter): An instance of the SlackExporter class.
+        image_pool (ThreadPoolExecutor): Worker pool used to prepare images ahead of layout.
         styles (dict): The styles used for the PDF document.
     """
 
-    def __init__(self, token: str):
+    MESSAGE_TABLE_STYLE = TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ])
+    IMAGE_MAX_WIDTH = 400
+    # Attachments wider than this many pixels are downscaled before embedding;
+    # twice the display width keeps them sharp when printed.
+    IMAGE_MAX_PIXELS = 2 * IMAGE_MAX_WIDTH
+    # Number of messages held back before being laid out, so their images can be
+    # prepared in the background while the next batch is fetched.
+    PREFETCH_WINDOW = SlackExporter.BATCH_SIZE
+
+    def __init__(self, token: str, cache_path: str = None, max_workers: int = SlackExporter.MAX_WORKERS):
         """
         Initializes the SlackPDFExporter with the provided Slack API token.
 
         Args:
             token (str): The Slack API token.
+            cache_path (str, optional): Path of an SQLite file used to cache downloads, users and channels between runs.
+            max_workers (int, optional): The maximum number of concurrent Slack requests.
         """
-        self.exporter = SlackExporter(token)
+        self.exporter = SlackExporter(token, cache_path, max_workers)
+        self.image_pool = ThreadPoolExecutor(max_workers=max_workers)
         self.styles = getSampleStyleSheet()
+        self._avatar_cache = {}
+        self._avatar_images = {}
+        self._image_cache = {}
         self.setup_styles()
 
     def setup_styles(self):
@@ -284,6 +847,122 @@ class SlackPDFExporter:
             spaceBefore=5,
             spaceAfter=5
         ))
+        self._normal_style = self.styles['Normal']
+        self._thread_style = self.styles['ThreadMessage']
+
+    @staticmethod
+    def _resize_avatar(data: bytes) -> bytes:
+        """
+        Resizes an avatar to fit the 24x24 avatar column.
+
+        Args:
+            data (bytes): The original avatar image data.
+
+        Returns:
+            bytes: The resized avatar PNG data.
+        """
+        img = PILImage.open(BytesIO(data))
+        img.thumbnail((24, 24), PILImage.Resampling.BILINEAR)
+        avatar_io = BytesIO()
+        img.save(avatar_io, format='PNG', optimize=False)
+        return avatar_io.getvalue()
+
+    def _prefetch_avatar(self, user: Dict) -> Future:
+        """
+        Starts resizing the user's avatar on the image pool the first time the user is seen.
+
+        Args:
+            user (dict): The processed user information.
+
+        Returns:
+            Future: A future resolving to the resized avatar PNG data.
+        """
+        if user['id'] not in self._avatar_cache:
+            self._avatar_cache[user['id']] = self.image_pool.submit(self._resize_avatar, user['image'])
+        return self._avatar_cache[user['id']]
+
+    def _get_avatar_png(self, user: Dict) -> bytes:
+        """
+        Returns the user's avatar as a 24x24 PNG, resizing it only the first time the user is seen.
+
+        Args:
+            user (dict): The processed user information.
+
+        Returns:
+            bytes: The resized avatar PNG data.
+        """
+        return self._prefetch_avatar(user).result()
+
+    def _prefetch_image(self, data: bytes) -> Future:
+        """
+        Starts preparing an attachment on the image pool, unless the same image has already
+        been started. Images are keyed by content hash, so an image posted several times is
+        only processed once and every copy in the PDF shares the same bytes.
+
+        Args:
+            data (bytes): The original image data.
+
+        Returns:
+            Future: A future resolving to the result of _downscale_image.
+        """
+        key = hashlib.sha1(data).digest()
+        if key not in self._image_cache:
+            self._image_cache[key] = self.image_pool.submit(self._downscale_image, data)
+        return self._image_cache[key]
+
+    def _prepare_image(self, data: bytes) -> Tuple[bytes, int, int]:
+        """
+        Downscales an attachment that is much larger than it will be displayed, so the
+        PDF embeds pixels proportional to the displayed area rather than the original.
+
+        Args:
+            data (bytes): The original image data.
+
+        Returns:
+            tuple: The image data to embed, and the original width and height in pixels.
+        """
+        return self._prefetch_image(data).result()
+
+    def _downscale_image(self, data: bytes) -> Tuple[bytes, int, int]:
+        """
+        Downscales an image wider than IMAGE_MAX_PIXELS; smaller images are returned unchanged.
+
+        Args:
+            data (bytes): The original image data.
+
+        Returns:
+            tuple: The image data to embed, and the original width and height in pixels.
+        """
+        img = PILImage.open(BytesIO(data))
+        w, h = img.size
+        if w <= self.IMAGE_MAX_PIXELS:
+            return data, w, h
+
+        # For JPEGs, let the decoder scale down by a power of two while decoding instead of
+        # expanding every pixel of the original; other formats ignore the draft request.
+        img.draft('RGB', (self.IMAGE_MAX_PIXELS, max(1, h * self.IMAGE_MAX_PIXELS // w)))
+        img.thumbnail((self.IMAGE_MAX_PIXELS, h), PILImage.Resampling.BILINEAR)
+        img_io = BytesIO()
+        if img.mode in ('RGBA', 'LA') or 'transparency' in img.info:
+            img.save(img_io, format='PNG')
+        else:
+            img.convert('RGB').save(img_io, format='JPEG', quality=80)
+        return img_io.getvalue(), w, h
+
+    def _get_avatar_image(self, user: Dict) -> Image:
+        """
+        Returns the user's avatar flowable. A single flowable is shared by all of the
+        user's messages, so the avatar is only read by ReportLab once per user.
+
+        Args:
+            user (dict): The processed user information.
+
+        Returns:
+            Image: A 24x24 ReportLab Image of the avatar.
+        """
+        if user['id'] not in self._avatar_images:
+            self._avatar_images[user['id']] = Image(BytesIO(self._get_avatar_png(user)), width=24, height=24)
+        return self._avatar_images[user['id']]
 
     def create_message_table(self, message, is_thread=False):
         """
@@ -298,20 +977,12 @@ class SlackPDFExporter:
         """
         avatar_data = None
         if message['user']['image']:
-            img_data = base64.b64decode(message['user']['image'])
-            img = PILImage.open(BytesIO(img_data))
-            img = img.resize((24, 24))
-            avatar_io = BytesIO()
-            img.save(avatar_io, format='PNG')
-            avatar_data = Image(BytesIO(avatar_io.getvalue()), width=24, height=24)
-
-        timestamp = datetime.fromtimestamp(float(message['timestamp']))
-        formatted_time = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+            avatar_data = self._get_avatar_image(message['user'])
 
-        style = self.styles['ThreadMessage'] if is_thread else self.styles['Normal']
+        style = self._thread_style if is_thread else self._normal_style
         content = [[
             avatar_data or '',
-            Paragraph(f"<b>{message['user']['name']}</b> {formatted_time}", style),
+            Paragraph(f"<b>{message['user']['name']}</b> {message['formatted_time']}", style),
         ]]
 
         content.append(['', Paragraph(message['text'], style)])
@@ -319,25 +990,52 @@ class SlackPDFExporter:
         if message['files']:
             for file in message['files']:
                 if file['data']:
-                    img_data = base64.b64decode(file['data'])
-                    img = PILImage.open(BytesIO(img_data))
-                    w, h = img.size
+                    img_data, w, h = self._prepare_image(file['data'])
                     aspect = w / h
-                    max_width = 400
-                    width = min(w, max_width)
+                    width = min(w, self.IMAGE_MAX_WIDTH)
                     height = width / aspect
                     img_obj = Image(BytesIO(img_data), width=width, height=height)
                     content.append(['', img_obj])
 
         table = Table(content, colWidths=[0.4 * inch, 6 * inch])
-        table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-        ]))
+        table.setStyle(self.MESSAGE_TABLE_STYLE)
 
         return table
 
+    def close(self):
+        """
+        Releases the image workers and the connections, worker threads and cache held by the underlying exporter.
+        """
+        self.image_pool.shutdown()
+        self.exporter.close()
+
+    def _prefetch_images(self, message: Dict):
+        """
+        Starts preparing the avatars and attachments of a message and its replies in the background.
+
+        Args:
+            message (dict): The processed Slack message data.
+        """
+        for msg in (message, *message.get('replies', ())):
+            if msg['user']['image']:
+                self._prefetch_avatar(msg['user'])
+            for file in msg['files']:
+                if file['data']:
+                    self._prefetch_image(file['data'])
+
+    def _append_message(self, story: List, message: Dict):
+        """
+        Lays out a message and its replies at the end of the story.
+
+        Args:
+            story (list): The flowables of the PDF document.
+            message (dict): The processed Slack message data.
+        """
+        story.append(self.create_message_table(message))
+        for reply in message.get('replies', ()):
+            story.append(self.create_message_table(reply, is_thread=True))
+        story.append(Spacer(1, 12))
+
     def export_to_pdf(self, channel_name: str, output_file: str):
         """
         Exports the messages from the specified Slack channel to a PDF document.
@@ -346,15 +1044,15 @@ class SlackPDFExporter:
             channel_name (str): The name of the Slack channel.
             output_file (str): The path to the output PDF file.
         """
-        messages = self.exporter.export_channel(channel_name)
-
         doc = SimpleDocTemplate(
             output_file,
             pagesize=letter,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
-            bottomMargin=72
+            bottomMargin=72,
+            # Compress page content streams regardless of the site's rl_config defaults.
+            pageCompression=1
         )
 
         story = []
@@ -362,42 +1060,133 @@ class SlackPDFExporter:
         story.append(title)
         story.append(Spacer(1, 12))
 
-        for message in messages:
-            story.append(self.create_message_table(message))
-            if message.get('replies'):
-                for reply in message['replies']:
-                    story.append(self.create_message_table(reply, is_thread=True))
-            story.append(Spacer(1, 12))
+        pending = deque()
+        for message in self.exporter.iter_channel(channel_name):
+            self._prefetch_images(message)
+            pending.append(message)
+            if len(pending) > self.PREFETCH_WINDOW:
+                self._append_message(story, pending.popleft())
+        while pending:
+            self._append_message(story, pending.popleft())
+
+        # doc.build() drops each flowable from the story once it is drawn; clearing the
+        # dedup cache first leaves the story as the only owner of the image data, so it
+        # is freed page by page rather than when the whole document is done.
+        self._image_cache.clear()
         doc.build(story)
 
 
+@contextmanager
+def _replace_on_success(path: str):
+    """
+    Opens a temporary file next to ``path`` for writing, and moves it into place only
+    once the block completes. If the export fails part-way, the previous file at
+    ``path`` is left as it was and the partial output is removed.
+
+    Args:
+        path (str): The path of the output file.
+
+    Yields:
+        A file object opened in binary mode with a 1 MiB write buffer.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb", buffering=1 << 20) as fp:
+            yield fp
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_json_export(fp, channel_name: str, messages: Iterable[Dict], pretty: bool = False):
+    """
+    Writes a JSON export one message at a time, so only the message being
+    serialized has to be held in memory.
+
+    Args:
+        fp: A file object opened in binary mode.
+        channel_name (str): The name of the Slack channel.
+        messages (iterable): The processed messages to write.
+        pretty (bool, optional): Indents the output for reading. Compact output is smaller and faster to write.
+    """
+    newline = b'\n' if pretty else b''
+    indent = b'  ' if pretty else b''
+    colon = b': ' if pretty else b':'
+    option = orjson.OPT_INDENT_2 if pretty else 0
+
+    fp.write(b'{' + newline + indent + b'"channel"' + colon + orjson.dumps(channel_name))
+    fp.write(b',' + newline + indent + b'"exported_at"' + colon + orjson.dumps(datetime.now().isoformat()))
+    fp.write(b',' + newline + indent + b'"messages"' + colon + b'[')
+    for i, message in enumerate(messages):
+        encoded = orjson.dumps(message, default=_json_default, option=option)
+        if pretty:
+            # orjson indents from column 0. JSON strings cannot contain raw newlines,
+            # so shifting every line into the array only touches whitespace.
+            encoded = encoded.replace(b'\n', b'\n' + indent * 2)
+        fp.write((b',' if i else b'') + newline + indent * 2 + encoded)
+    fp.write(newline + indent + b']' + newline + b'}')
+
+
+def write_jsonl_export(fp, messages: Iterable[Dict]):
+    """
+    Writes a JSON Lines export: one message per line, each encoded and written as soon
+    as it is produced. Unlike the JSON export there is no enclosing document, so the
+    output can be appended to or processed line by line.
+
+    Args:
+        fp: A file object opened in binary mode.
+        messages (iterable): The processed messages to write.
+    """
+    for message in messages:
+        fp.write(orjson.dumps(message, default=_json_default, option=orjson.OPT_APPEND_NEWLINE))
+
+
 def main():
     """
     The main function that handles the command-line interface.
     """
     parser = argparse.ArgumentParser(description='Export Slack channel messages')
-    parser.add_argument('--format', choices=['json', 'pdf'], default='json', help='Output format')
+    parser.add_argument('--format', choices=['json', 'jsonl', 'pdf'], default='json', help='Output format')
+    parser.add_argument('--channel', default='helene-logging',
+                        help='Name or ID of the channel to export; an ID skips listing the workspace channels')
+    parser.add_argument('--cache', default='slack_cache.sqlite',
+                        help='SQLite file used to skip re-downloading unchanged files, users and channels')
+    parser.add_argument('--pretty', action='store_true', help='Indent JSON output (slower and larger)')
+    parser.add_argument('--workers', type=int, default=SlackExporter.MAX_WORKERS,
+                        help='Maximum number of concurrent Slack requests')
     args = parser.parse_args()
 
     token = os.getenv("SLACK_TOKEN")
     if not token:
         raise ValueError("SLACK_TOKEN environment variable not set")
 
-    channel_name = "helene-logging"
+    # Worker threads only enqueue log records; a single listener thread formats and writes them.
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.handlers.QueueHandler(log_queue)])
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
 
-    if args.format == 'json':
-        exporter = SlackExporter(token)
-        messages = exporter.export_channel(channel_name)
-        output = {
-            "channel": channel_name,
-            "exported_at": datetime.now().isoformat(),
-            "messages": messages
-        }
-        with open("slack_export.json", "w") as f:
-            json.dump(output, f, indent=2)
+    channel_name = args.channel
+
+    if args.format == 'pdf':
+        exporter = SlackPDFExporter(token, args.cache, args.workers)
     else:
-        exporter = SlackPDFExporter(token)
-        exporter.export_to_pdf(channel_name, "slack_export.pdf")
+        exporter = SlackExporter(token, args.cache, args.workers)
+
+    try:
+        if args.format == 'json':
+            with _replace_on_success("slack_export.json") as f:
+                write_json_export(f, channel_name, exporter.iter_channel(channel_name), args.pretty)
+        elif args.format == 'jsonl':
+            with _replace_on_success("slack_export.jsonl") as f:
+                write_jsonl_export(f, exporter.iter_channel(channel_name))
+        else:
+            exporter.export_to_pdf(channel_name, "slack_export.pdf")
+    finally:
+        exporter.close()
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,28 @@
 import base64
+import io
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import patch, Mock
 
-from exporter import SlackExporter, SlackPDFExporter
+import orjson
+from PIL import Image as PILImage
+from PIL.JpegImagePlugin import JpegImageFile
+from reportlab.platypus import Spacer
+
+from exporter import (
+    SlackExporter,
+    SlackPDFExporter,
+    _json_default,
+    _replace_on_success,
+    write_json_export,
+    write_jsonl_export,
+)
 
 
 class TestSlackExporter(unittest.TestCase):
@@ -10,22 +30,90 @@ class TestSlackExporter(unittest.TestCase):
         self.token = "test-token"
         self.exporter = SlackExporter(self.token)
 
-    @patch('requests.get')
+    @staticmethod
+    def _slack_api(history, replies=None, user=None):
+        """
+        Builds a ``requests.Session.get`` side effect that serves the calls made by export_channel.
+
+        Args:
+            history (list): The conversations.history pages, each a list of messages newest first.
+            replies (list, optional): The conversations.replies messages. Without it, fetching replies fails the test.
+            user (dict, optional): The users.info user. Without it, users are not found.
+
+        Returns:
+            callable: The side effect. Requests outside the Slack API return ``b"file_data"``.
+        """
+        history_pages = list(history)
+
+        def respond(url, params=None, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            if url.endswith("conversations.list"):
+                payload = {"ok": True, "channels": [{"name": "test-channel", "id": "C123456"}]}
+            elif url.endswith("conversations.history"):
+                messages = history_pages.pop(0)
+                cursor = "next" if history_pages else ""
+                payload = {"ok": True, "messages": messages, "response_metadata": {"next_cursor": cursor}}
+            elif url.endswith("conversations.replies"):
+                if replies is None:
+                    raise AssertionError("unexpected conversations.replies request")
+                payload = {"ok": True, "messages": replies}
+            elif url.endswith("users.info") and user:
+                payload = {"ok": True, "user": user}
+            elif url.startswith("https://slack.com/api/"):
+                payload = {"ok": False, "error": "user_not_found"}
+            else:
+                response.content = b"file_data"
+                return response
+            response.content = json.dumps(payload).encode()
+            return response
+
+        return respond
+
+    @patch('requests.Session.get')
     def test_get_channel_id(self, mock_get):
         mock_response = Mock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
+            "ok": True,
             "channels": [{"name": "test-channel", "id": "C123456"}]
-        }
+        }).encode()
         mock_get.return_value = mock_response
 
         channel_id = self.exporter.get_channel_id("test-channel")
         self.assertEqual(channel_id, "C123456")
         mock_get.assert_called_once()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_get_channel_id_pages_and_caches(self, mock_get):
+        first_page = Mock()
+        first_page.content = json.dumps({
+            "ok": True,
+            "channels": [{"name": "general", "id": "C000001"}],
+            "response_metadata": {"next_cursor": "next"}
+        }).encode()
+        second_page = Mock()
+        second_page.content = json.dumps({
+            "ok": True,
+            "channels": [{"name": "test-channel", "id": "C123456"}],
+            "response_metadata": {"next_cursor": ""}
+        }).encode()
+        mock_get.side_effect = [first_page, second_page]
+
+        self.assertEqual(self.exporter.get_channel_id("test-channel"), "C123456")
+        self.assertEqual(self.exporter.get_channel_id("general"), "C000001")
+        self.assertEqual(self.exporter.get_channel_id("missing"), "")
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_get.call_args_list[1].kwargs["params"]["cursor"], "next")
+
+    @patch('requests.Session.get')
+    def test_get_channel_id_accepts_channel_id(self, mock_get):
+        self.assertEqual(self.exporter.get_channel_id("C0123456789"), "C0123456789")
+        mock_get.assert_not_called()
+
+    @patch('requests.Session.get')
     def test_fetch_user_info(self, mock_get):
         user_response = Mock()
-        user_response.json.return_value = {
+        user_response.content = json.dumps({
             "ok": True,
             "user": {
                 "name": "testuser",
@@ -35,7 +123,7 @@ class TestSlackExporter(unittest.TestCase):
                     "image_48": "http://example.com/image.jpg"
                 }
             }
-        }
+        }).encode()
 
         image_response = Mock()
         image_response.status_code = 200
@@ -46,13 +134,57 @@ class TestSlackExporter(unittest.TestCase):
 
         self.assertEqual(user_info["name"], "Test User")
         self.assertEqual(user_info["real_name"], "Test Real Name")
-        self.assertEqual(user_info["image"],
-                         base64.b64encode(b"fake-image-data").decode('utf-8'))
+        self.assertEqual(user_info["image"], b"fake-image-data")
+
+    @patch('requests.Session.get')
+    def test_fetch_user_info_reuses_avatar_download(self, mock_get):
+        def user_response(user_id):
+            response = Mock()
+            response.content = json.dumps({
+                "ok": True,
+                "user": {
+                    "name": user_id,
+                    "profile": {"image_48": "http://example.com/shared.jpg"}
+                }
+            }).encode()
+            return response
+
+        image_response = Mock()
+        image_response.status_code = 200
+        image_response.content = b"fake-image-data"
+
+        mock_get.side_effect = [user_response("U1"), image_response, user_response("U2")]
+        first = self.exporter.fetch_user_info("U1")
+        second = self.exporter.fetch_user_info("U2")
 
-    @patch('requests.get')
+        self.assertEqual(first["image"], second["image"])
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('requests.Session.get')
+    def test_prewarm_users_avoids_users_info(self, mock_get):
+        list_response = Mock()
+        list_response.content = json.dumps({
+            "ok": True,
+            "members": [{
+                "id": "U123456",
+                "name": "testuser",
+                "profile": {"display_name": "Test User", "real_name": "Test Real Name"}
+            }],
+            "response_metadata": {"next_cursor": ""}
+        }).encode()
+        mock_get.return_value = list_response
+
+        self.exporter._prewarm_users()
+        user_info = self.exporter.fetch_user_info("U123456")
+
+        self.assertEqual(user_info["name"], "Test User")
+        self.assertEqual(user_info["image"], b"")
+        mock_get.assert_called_once()
+
+    @patch('requests.Session.get')
     def test_fetch_thread_replies(self, mock_get):
         user_response = Mock()
-        user_response.json.return_value = {
+        user_response.content = json.dumps({
             "ok": True,
             "user": {
                 "name": "testuser",
@@ -62,10 +194,10 @@ class TestSlackExporter(unittest.TestCase):
                     "image_48": ""
                 }
             }
-        }
+        }).encode()
 
         thread_response = Mock()
-        thread_response.json.return_value = {
+        thread_response.content = json.dumps({
             "ok": True,
             "messages": [
                 {"text": "Parent message", "ts": "1234567.89"},
@@ -73,7 +205,7 @@ class TestSlackExporter(unittest.TestCase):
                 {"text": "Reply 2", "ts": "1234567.91", "user": "U123456"}
             ],
             "has_more": False
-        }
+        }).encode()
 
         mock_get.side_effect = [thread_response, user_response, user_response]
         replies = self.exporter.fetch_thread_replies("C123456", "1234567.89")
@@ -82,10 +214,250 @@ class TestSlackExporter(unittest.TestCase):
         self.assertEqual(replies[0]["text"], "Reply 1")
         self.assertEqual(replies[1]["text"], "Reply 2")
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_fetch_thread_replies_keeps_order_across_pages(self, mock_get):
+        first_page = Mock()
+        first_page.content = json.dumps({
+            "ok": True,
+            "messages": [
+                {"text": "Parent message", "ts": "1234567.89"},
+                {"text": "Reply 1", "ts": "1234567.90"},
+                {"text": "Reply 2", "ts": "1234567.91"}
+            ],
+            "response_metadata": {"next_cursor": "page2"}
+        }).encode()
+        second_page = Mock()
+        second_page.content = json.dumps({
+            "ok": True,
+            "messages": [
+                {"text": "Parent message", "ts": "1234567.89"},
+                {"text": "Reply 3", "ts": "1234567.92"}
+            ],
+            "response_metadata": {"next_cursor": ""}
+        }).encode()
+
+        user_response = Mock()
+        user_response.content = json.dumps({"ok": False, "error": "user_not_found"}).encode()
+        pages = iter([first_page, second_page])
+
+        mock_get.side_effect = lambda url, **kwargs: user_response if url.endswith("users.info") else next(pages)
+        replies = self.exporter.fetch_thread_replies("C123456", "1234567.89")
+
+        self.assertEqual([reply["text"] for reply in replies], ["Reply 1", "Reply 2", "Reply 3"])
+        page_calls = [c for c in mock_get.call_args_list if c.args[0].endswith("conversations.replies")]
+        self.assertEqual(page_calls[1].kwargs["params"]["cursor"], "page2")
+
+    @patch('requests.Session.get')
+    def test_fetch_thread_replies_falls_back_to_smaller_page(self, mock_get):
+        rejected_response = Mock()
+        rejected_response.content = json.dumps({"ok": False, "error": "invalid_limit"}).encode()
+
+        thread_response = Mock()
+        thread_response.content = json.dumps({
+            "ok": True,
+            "messages": [{"text": "Parent message", "ts": "1234567.89"}],
+            "has_more": False
+        }).encode()
+
+        mock_get.side_effect = [rejected_response, thread_response]
+        replies = self.exporter.fetch_thread_replies("C123456", "1234567.89")
+
+        self.assertEqual(replies, [])
+        self.assertEqual(mock_get.call_args_list[0].kwargs["params"]["limit"], SlackExporter.PAGE_LIMIT)
+        self.assertEqual(mock_get.call_args_list[1].kwargs["params"]["limit"], SlackExporter.FALLBACK_PAGE_LIMIT)
+
+    def _serve(self, responses):
+        """
+        Starts a local HTTP server and routes plain-HTTP requests through the exporter's
+        real retrying adapter, so urllib3's retry handling is exercised.
+
+        Args:
+            responses (list): (status, headers, body) tuples served in order; the last one repeats.
+
+        Returns:
+            tuple: The server's base URL, and the list of paths it has been asked for.
+        """
+        responses = list(responses)
+        requested = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                requested.append(self.path)
+                status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+                self.send_response(status)
+                for name, value in {**headers, "Content-Length": str(len(body))}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.exporter.session.mount("http://", self.exporter.session.get_adapter("https://"))
+        return f"http://127.0.0.1:{server.server_port}", requested
+
+    @patch('urllib3.util.retry.Retry.sleep')
+    def test_download_image_skips_persistently_failing_file(self, mock_sleep):
+        base_url, requested = self._serve([(503, {}, b"")])
+
+        data = self.exporter.download_image(f"{base_url}/file.png")
+
+        self.assertEqual(data, b"")
+        self.assertGreater(len(requested), 1)
+
+    @patch('requests.Session.get')
+    def test_download_image_revalidates_with_etag(self, mock_get):
+        first_response = Mock()
+        first_response.status_code = 200
+        first_response.content = b"image_data"
+        first_response.headers = {"ETag": '"abc"'}
+
+        not_modified_response = Mock()
+        not_modified_response.status_code = 304
+
+        mock_get.side_effect = [first_response, not_modified_response]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            exporter = SlackExporter(self.token, os.path.join(cache_dir, "cache.sqlite"))
+            first = exporter.download_image("http://example.com/test.jpg")
+            second = exporter.download_image("http://example.com/test.jpg")
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_args_list[1].kwargs["headers"], {"If-None-Match": '"abc"'})
+
+    @patch('time.sleep')
+    @patch('requests.Session.get')
+    def test_api_get_retries_ratelimited_body(self, mock_get, mock_sleep):
+        limited_response = Mock()
+        limited_response.content = json.dumps({"ok": False, "error": "ratelimited"}).encode()
+        limited_response.headers = {"Retry-After": "3"}
+        ok_response = Mock()
+        ok_response.content = json.dumps({"ok": True}).encode()
+        mock_get.side_effect = [limited_response, ok_response]
+
+        result = self.exporter._api_get("https://slack.com/api/users.info", {"user": "U123456"})
+
+        self.assertTrue(result["ok"])
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], 3.0, places=1)
+
+    @patch('time.sleep')
+    def test_rate_limit_pauses_other_requests(self, mock_sleep):
+        base_url, requested = self._serve([(429, {"Retry-After": "5"}, b""), (200, {}, b"image_data")])
+
+        with patch.object(self.exporter, '_pause_requests', wraps=self.exporter._pause_requests) as pause:
+            first = self.exporter.download_image(f"{base_url}/first.jpg")
+            second = self.exporter.download_image(f"{base_url}/second.jpg")
+
+        self.assertEqual((first, second), (b"image_data", b"image_data"))
+        self.assertEqual(requested, ["/first.jpg", "/first.jpg", "/second.jpg"])
+        pause.assert_called_once()
+        # The pause holds back the retry and the next request alike.
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertTrue(all(call.args[0] > 4 for call in mock_sleep.call_args_list))
+
+    @patch('requests.Session.get')
+    def test_cache_persists_users_and_channels_across_runs(self, mock_get):
+        list_response = Mock()
+        list_response.content = json.dumps({
+            "ok": True,
+            "members": [{"id": "U123456", "name": "testuser", "profile": {"display_name": "Test User"}}]
+        }).encode()
+        channels_response = Mock()
+        channels_response.content = json.dumps({
+            "ok": True,
+            "channels": [{"name": "test-channel", "id": "C123456"}]
+        }).encode()
+        mock_get.side_effect = [list_response, channels_response]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "cache.sqlite")
+            first_run = SlackExporter(self.token, cache_path)
+            first_run._prewarm_users()
+            first_run.get_channel_id("test-channel")
+            first_run.close()
+
+            second_run = SlackExporter(self.token, cache_path)
+            second_run._prewarm_users()
+            self.assertEqual(second_run.get_channel_id("test-channel"), "C123456")
+            self.assertEqual(second_run.fetch_user_info("U123456")["name"], "Test User")
+            second_run.close()
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_user_listing_expires_despite_newer_single_profiles(self, mock_get):
+        def respond(url, params=None, **kwargs):
+            response = Mock()
+            if url.endswith("users.list"):
+                payload = {"ok": True, "members": [{"id": "U000001", "name": "member", "profile": {}}]}
+            else:
+                payload = {"ok": True, "user": {"name": "external", "profile": {}}}
+            response.content = json.dumps(payload).encode()
+            return response
+
+        mock_get.side_effect = respond
+        day = 24 * 60 * 60
+        start = time.time()
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "cache.sqlite")
+            for elapsed, user_id in [(0, "U000001"), (3 * day, "U000002"), (8 * day, "U000001")]:
+                with patch('exporter.time.time', return_value=start + elapsed):
+                    run = SlackExporter(self.token, cache_path)
+                    run._prewarm_users()
+                    run.fetch_user_info(user_id)
+                    run.close()
+
+        urls = [call.args[0] for call in mock_get.call_args_list]
+        # The single U000002 profile saved on day 3 must not stand in for a listing on day 8.
+        self.assertEqual(sum(url.endswith("users.list") for url in urls), 2)
+        self.assertEqual(sum(url.endswith("users.info") for url in urls), 1)
+
+    @patch('requests.Session.get')
+    def test_cached_channel_names_expire(self, mock_get):
+        old_channel = Mock()
+        old_channel.content = json.dumps({
+            "ok": True,
+            "channels": [{"name": "test-channel", "id": "C123456"}]
+        }).encode()
+        renamed_channel = Mock()
+        renamed_channel.content = json.dumps({
+            "ok": True,
+            "channels": [{"name": "test-channel", "id": "C654321"}]
+        }).encode()
+        mock_get.side_effect = [old_channel, renamed_channel]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "cache.sqlite")
+            first_run = SlackExporter(self.token, cache_path)
+            first_run.get_channel_id("test-channel")
+            first_run.close()
+
+            later = time.time() + SlackExporter.CHANNEL_CACHE_TTL + 1
+            with patch('exporter.time.time', return_value=later):
+                second_run = SlackExporter(self.token, cache_path)
+                self.assertEqual(second_run.get_channel_id("test-channel"), "C654321")
+                second_run.close()
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.close')
+    def test_close_releases_sessions_and_pools(self, mock_close):
+        self.exporter.close()
+
+        self.assertEqual(mock_close.call_count, 2)
+        with self.assertRaises(RuntimeError):
+            self.exporter.pool.submit(print)
+
+    @patch('requests.Session.get')
     def test_process_message(self, mock_get):
         user_response = Mock()
-        user_response.json.return_value = {
+        user_response.content = json.dumps({
             "ok": True,
             "user": {
                 "name": "testuser",
@@ -95,7 +467,7 @@ class TestSlackExporter(unittest.TestCase):
                     "image_48": ""
                 }
             }
-        }
+        }).encode()
         mock_get.return_value = user_response
 
         message = {
@@ -107,21 +479,23 @@ class TestSlackExporter(unittest.TestCase):
         processed = self.exporter.process_message(message)
         self.assertEqual(processed["text"], "Test message")
         self.assertEqual(processed["timestamp"], "1234567.89")
+        self.assertEqual(processed["formatted_time"],
+                         datetime.fromtimestamp(1234567.89).strftime('%Y-%m-%d %H:%M:%S'))
         self.assertEqual(processed["user"]["name"], "Test User")
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_user_info_failed_request(self, mock_get):
         user_response = Mock()
-        user_response.json.return_value = {"ok": False, "error": "user_not_found"}
+        user_response.content = json.dumps({"ok": False, "error": "user_not_found"}).encode()
         mock_get.return_value = user_response
 
         user_info = self.exporter.fetch_user_info("U123456")
         self.assertEqual(user_info["name"], "U123456")
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_process_message_with_files(self, mock_get):
         user_response = Mock()
-        user_response.json.return_value = {
+        user_response.content = json.dumps({
             "ok": True,
             "user": {
                 "name": "testuser",
@@ -130,13 +504,14 @@ class TestSlackExporter(unittest.TestCase):
                     "real_name": "Test Real Name"
                 }
             }
-        }
+        }).encode()
 
         image_response = Mock()
         image_response.status_code = 200
         image_response.content = b"image_data"
 
-        mock_get.side_effect = [user_response, image_response]
+        # The attachment download runs concurrently with the user lookup, so answer by URL.
+        mock_get.side_effect = lambda url, **kwargs: image_response if url.endswith(".jpg") else user_response
 
         message = {
             "user": "U123456",
@@ -153,6 +528,163 @@ class TestSlackExporter(unittest.TestCase):
         self.assertEqual(len(processed["files"]), 1)
         self.assertEqual(processed["files"][0]["name"], "test.jpg")
 
+        self.exporter.process_message(message)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_export_channel_attaches_replies(self, mock_get, mock_post):
+        mock_get.side_effect = self._slack_api(
+            history=[[
+                {"text": "Second", "ts": "1234567.95"},
+                {"text": "First", "ts": "1234567.89", "reply_count": 1}
+            ]],
+            replies=[
+                {"text": "First", "ts": "1234567.89"},
+                {"text": "Reply", "ts": "1234567.90"}
+            ]
+        )
+
+        messages = self.exporter.export_channel("test-channel")
+
+        self.assertEqual([m["text"] for m in messages], ["First", "Second"])
+        self.assertEqual([r["text"] for r in messages[0]["replies"]], ["Reply"])
+        self.assertEqual(messages[1]["replies"], [])
+        mock_post.assert_called_once()
+
+    def test_json_default_base64_encodes_bytes(self):
+        encoded = orjson.dumps({"image": b"fake-image-data"}, default=_json_default)
+        self.assertEqual(json.loads(encoded)["image"],
+                         base64.b64encode(b"fake-image-data").decode('utf-8'))
+
+    def test_write_json_export(self):
+        messages = iter([
+            {"text": "First", "files": [{"data": b"image_data"}]},
+            {"text": "Second", "files": []}
+        ])
+        fp = io.BytesIO()
+
+        write_json_export(fp, "test-channel", messages)
+
+        output = json.loads(fp.getvalue())
+        self.assertEqual(output["channel"], "test-channel")
+        self.assertIn("exported_at", output)
+        self.assertEqual([m["text"] for m in output["messages"]], ["First", "Second"])
+        self.assertEqual(output["messages"][0]["files"][0]["data"],
+                         base64.b64encode(b"image_data").decode('utf-8'))
+
+    def test_trim_message_keeps_processed_fields(self):
+        message = {
+            "type": "message",
+            "user": "U123456",
+            "text": "Hi",
+            "ts": "1.0",
+            "reply_count": 2,
+            "blocks": [{"type": "rich_text", "elements": []}],
+            "reactions": [{"name": "wave", "count": 1}],
+            "files": [{
+                "name": "image.png",
+                "mimetype": "image/png",
+                "url_private": "https://files.slack.com/image.png",
+                "thumb_360": "https://files.slack.com/image_360.png"
+            }]
+        }
+
+        self.assertEqual(SlackExporter._trim_message(message), {
+            "user": "U123456",
+            "text": "Hi",
+            "ts": "1.0",
+            "reply_count": 2,
+            "files": [{
+                "name": "image.png",
+                "mimetype": "image/png",
+                "url_private": "https://files.slack.com/image.png"
+            }]
+        })
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_export_channel_prefetches_authors(self, mock_get, mock_post):
+        mock_get.side_effect = self._slack_api(
+            history=[[{"text": "Hi", "ts": "1.0", "user": "U123456"}]],
+            user={"name": "testuser", "profile": {"image_48": "http://example.com/avatar.png"}}
+        )
+
+        process_message = self.exporter.process_message
+        cached_when_processed = []
+
+        def process(msg):
+            cached_when_processed.append(msg["user"] in self.exporter.users_cache)
+            return process_message(msg)
+
+        with patch.object(self.exporter, 'process_message', side_effect=process):
+            messages = self.exporter.export_channel("test-channel")
+
+        self.assertEqual(cached_when_processed, [True])
+        self.assertEqual(messages[0]["user"]["image"], b"file_data")
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_export_channel_reuses_broadcast_replies(self, mock_get, mock_post):
+        # No replies are served, so fetching the thread fails the test.
+        mock_get.side_effect = self._slack_api(history=[[
+            {"text": "Broadcast", "ts": "2.0", "thread_ts": "1.0"},
+            {"text": "Parent", "ts": "1.0", "thread_ts": "1.0", "reply_count": 1}
+        ]])
+
+        messages = self.exporter.export_channel("test-channel")
+
+        self.assertEqual([r["text"] for r in messages[0]["replies"]], ["Broadcast"])
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_export_channel_orders_pages_oldest_first(self, mock_get, mock_post):
+        mock_get.side_effect = self._slack_api(history=[
+            [{"text": "4", "ts": "4.0"}, {"text": "3", "ts": "3.0"}],
+            [{"text": "2", "ts": "2.0"}, {"text": "1", "ts": "1.0"}]
+        ])
+
+        messages = self.exporter.export_channel("test-channel")
+
+        self.assertEqual([m["text"] for m in messages], ["1", "2", "3", "4"])
+
+    def test_failed_export_keeps_previous_output(self):
+        def failing_messages():
+            yield {"text": "First", "files": []}
+            raise Exception("Failed to fetch messages: ratelimited")
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            path = os.path.join(out_dir, "slack_export.json")
+            with _replace_on_success(path) as fp:
+                write_json_export(fp, "test-channel", iter([{"text": "Old", "files": []}]))
+
+            with self.assertRaises(Exception):
+                with _replace_on_success(path) as fp:
+                    write_json_export(fp, "test-channel", failing_messages())
+
+            with open(path, "rb") as fp:
+                self.assertEqual(json.load(fp)["messages"], [{"text": "Old", "files": []}])
+            self.assertEqual(os.listdir(out_dir), ["slack_export.json"])
+
+    def test_write_json_export_pretty(self):
+        fp = io.BytesIO()
+
+        write_json_export(fp, "test-channel", iter([{"text": "First", "files": []}]), pretty=True)
+
+        output = fp.getvalue()
+        self.assertIn(b'\n  "messages": [\n    {\n      "text": "First"', output)
+        self.assertEqual(json.loads(output)["messages"], [{"text": "First", "files": []}])
+
+    def test_write_jsonl_export(self):
+        fp = io.BytesIO()
+
+        write_jsonl_export(fp, iter([{"text": "First", "files": [{"data": b"image_data"}]}, {"text": "Second"}]))
+
+        lines = fp.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["text"] for line in lines], ["First", "Second"])
+        self.assertEqual(json.loads(lines[0])["files"][0]["data"],
+                         base64.b64encode(b"image_data").decode('utf-8'))
+
 
 class TestSlackPDFExporter(unittest.TestCase):
     def setUp(self):
@@ -168,17 +700,141 @@ class TestSlackPDFExporter(unittest.TestCase):
 
         message = {
             "user": {
+                "id": "U123456",
                 "name": "Test User",
-                "image": base64.b64encode(b"fake-image-data").decode('utf-8')
+                "image": b"fake-image-data"
             },
             "text": "Test message",
             "timestamp": "1234567.89",
+            "formatted_time": "1970-01-15 06:56:07",
             "files": []
         }
 
         table = self.pdf_exporter.create_message_table(message)
         self.assertIsNotNone(table)
 
+    @patch('PIL.Image.open')
+    def test_avatar_resized_once_per_user(self, mock_pil_open):
+        mock_pil_open.return_value = Mock()
+        user = {"id": "U123456", "name": "Test User", "image": b"fake-image-data"}
+
+        first = self.pdf_exporter._get_avatar_png(user)
+        second = self.pdf_exporter._get_avatar_png(user)
+
+        self.assertIs(first, second)
+        mock_pil_open.assert_called_once()
+        mock_pil_open.return_value.thumbnail.assert_called_once()
+
+    def test_prepare_image_downscales_large_attachments(self):
+        original = io.BytesIO()
+        PILImage.new('RGB', (2000, 1000)).save(original, format='PNG')
+
+        data, w, h = self.pdf_exporter._prepare_image(original.getvalue())
+
+        self.assertEqual((w, h), (2000, 1000))
+        self.assertEqual(PILImage.open(io.BytesIO(data)).size, (SlackPDFExporter.IMAGE_MAX_PIXELS, 400))
+
+    def test_prepare_image_decodes_large_jpegs_at_reduced_scale(self):
+        original = io.BytesIO()
+        PILImage.new('RGB', (2000, 1000)).save(original, format='JPEG')
+
+        with patch.object(JpegImageFile, 'draft', autospec=True, side_effect=JpegImageFile.draft) as draft:
+            data, w, h = self.pdf_exporter._prepare_image(original.getvalue())
+
+        self.assertEqual(draft.call_args_list[0].args[1:], ('RGB', (SlackPDFExporter.IMAGE_MAX_PIXELS, 400)))
+        self.assertEqual((w, h), (2000, 1000))
+        embedded = PILImage.open(io.BytesIO(data))
+        self.assertEqual(embedded.format, 'JPEG')
+        self.assertEqual(embedded.size, (SlackPDFExporter.IMAGE_MAX_PIXELS, 400))
+
+    def test_prepare_image_downscales_very_wide_jpegs(self):
+        original = io.BytesIO()
+        PILImage.new('RGB', (10000, 5)).save(original, format='JPEG')
+
+        data, w, h = self.pdf_exporter._prepare_image(original.getvalue())
+
+        self.assertEqual((w, h), (10000, 5))
+        self.assertEqual(PILImage.open(io.BytesIO(data)).size[0], SlackPDFExporter.IMAGE_MAX_PIXELS)
+
+    def test_prepare_image_keeps_small_attachments(self):
+        original = io.BytesIO()
+        PILImage.new('RGB', (300, 200)).save(original, format='PNG')
+
+        data, w, h = self.pdf_exporter._prepare_image(original.getvalue())
+
+        self.assertEqual(data, original.getvalue())
+        self.assertEqual((w, h), (300, 200))
+
+    @patch('PIL.Image.open')
+    def test_prepare_image_reuses_duplicate_images(self, mock_pil_open):
+        mock_pil_open.return_value.size = (300, 200)
+
+        first = self.pdf_exporter._prepare_image(b"image_data")
+        second = self.pdf_exporter._prepare_image(bytes(b"image_data"))
+
+        self.assertIs(first, second)
+        mock_pil_open.assert_called_once()
+
+    @patch('exporter.SimpleDocTemplate')
+    def test_export_to_pdf_releases_image_cache_before_build(self, mock_doc_template):
+        message = {
+            "user": {"id": "U123456", "name": "Test User", "image": b""},
+            "text": "Test message",
+            "formatted_time": "1970-01-15 06:56:07",
+            "files": [],
+            "replies": []
+        }
+        self.pdf_exporter._image_cache[b"key"] = (b"image_data", 1, 1)
+
+        with patch.object(self.pdf_exporter.exporter, 'iter_channel', return_value=iter([message])):
+            mock_doc_template.return_value.build.side_effect = \
+                lambda story: self.assertEqual(self.pdf_exporter._image_cache, {})
+            self.pdf_exporter.export_to_pdf("test-channel", "out.pdf")
+
+        story = mock_doc_template.return_value.build.call_args.args[0]
+        self.assertEqual(len(story), 4)
+        self.assertEqual(mock_doc_template.call_args.kwargs["pageCompression"], 1)
+
+    @patch('exporter.Image')
+    @patch.object(SlackPDFExporter, '_resize_avatar', return_value=b"png-data")
+    def test_avatar_flowable_shared_per_user(self, mock_resize, mock_image):
+        user = {"id": "U123456", "name": "Test User", "image": b"fake-image-data"}
+
+        first = self.pdf_exporter._get_avatar_image(user)
+        second = self.pdf_exporter._get_avatar_image(user)
+
+        self.assertIs(first, second)
+        mock_image.assert_called_once()
+
+    @patch('exporter.SimpleDocTemplate')
+    def test_export_to_pdf_prefetches_images_ahead_of_layout(self, mock_doc_template):
+        self.pdf_exporter.PREFETCH_WINDOW = 1
+        messages = [
+            {
+                "user": {"id": f"U{i}", "name": f"User {i}", "image": b"avatar"},
+                "files": [{"name": "image.png", "mimetype": "image/png", "data": f"image {i}".encode()}],
+                "replies": []
+            }
+            for i in range(3)
+        ]
+        prefetched_when_laid_out = []
+
+        def create_message_table(message, is_thread=False):
+            prefetched_when_laid_out.append(
+                (sorted(self.pdf_exporter._avatar_cache), len(self.pdf_exporter._image_cache))
+            )
+            return Spacer(1, 1)
+
+        with patch.object(SlackPDFExporter, '_resize_avatar', return_value=b"png-data"), \
+                patch.object(SlackPDFExporter, '_downscale_image', return_value=(b"image", 1, 1)), \
+                patch.object(self.pdf_exporter, 'create_message_table', side_effect=create_message_table), \
+                patch.object(self.pdf_exporter.exporter, 'iter_channel', return_value=iter(messages)):
+            self.pdf_exporter.export_to_pdf("test-channel", "out.pdf")
+
+        self.assertEqual(prefetched_when_laid_out[0], (["U0", "U1"], 2))
+        story = mock_doc_template.return_value.build.call_args.args[0]
+        self.assertEqual(len(story), 2 + 2 * len(messages))
+
     def test_setup_styles(self):
         self.assertIn('ThreadMessage', self.pdf_exporter.styles.byName)
         thread_style = self.pdf_exporter.styles['ThreadMessage']